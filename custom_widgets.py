@@ -1,5 +1,5 @@
-from PySide6.QtCore import Qt, QPoint, QSize
-from PySide6.QtGui import QPainter
+from PySide6.QtCore import Qt, QPoint, QSize, QEvent
+from PySide6.QtGui import QPainter, QPixmap
 from PySide6.QtWidgets import QLabel
 
 
@@ -11,19 +11,65 @@ class VerticalText(QLabel):
     def __init__(self, text):
         super(VerticalText, self).__init__(text)
 
+        self.cache = None  # Pixmap of the rotated text, redrawn only when invalidated
+        self.size_hint_cache = None  # Flipped size hint, recalculated only when invalidated
+        self.min_size_hint_cache = None  # Flipped minimum size hint, recalculated only when invalidated
+
+    def clear_size_hints(self):
+        """
+        Discards cached size hints and lets the layout know they have changed
+        """
+        self.size_hint_cache = None
+        self.min_size_hint_cache = None
+        self.updateGeometry()
+
+    def setText(self, text: str):
+        self.cache = None
+        super().setText(text)
+        self.clear_size_hints()
+
+    def changeEvent(self, e):
+        # Appearance of text changes with font and palette
+        if e.type() in (QEvent.FontChange, QEvent.PaletteChange, QEvent.StyleChange):
+            self.cache = None
+        # Size of text only changes with font and style
+        if e.type() in (QEvent.FontChange, QEvent.StyleChange):
+            self.clear_size_hints()
+        super().changeEvent(e)
+
+    def resizeEvent(self, e):
+        self.cache = None
+        super().resizeEvent(e)
+
     def paintEvent(self, e):
-        # Use painter to rotate text
+        if self.cache is None:
+            # Draw at device resolution so text stays sharp on HiDPI screens
+            ratio = self.devicePixelRatioF()
+            self.cache = QPixmap(self.size() * ratio)
+            self.cache.setDevicePixelRatio(ratio)
+            self.cache.fill(Qt.transparent)
+            # Use painter to rotate text
+            cache_painter = QPainter(self.cache)
+            cache_painter.setFont(self.font())
+            cache_painter.setPen(self.palette().color(self.foregroundRole()))
+            cache_painter.rotate(270)
+            # Must adjust start position to draw in correct place
+            cache_painter.drawText(QPoint(-self.height(), self.width()), self.text())
+            cache_painter.end()
+
         painter = QPainter(self)
-        painter.rotate(270)
-        # Must adjust start position to draw in correct place
-        painter.drawText(QPoint(-self.height(), self.width()), self.text())
+        painter.drawPixmap(0, 0, self.cache)
 
     def sizeHint(self):
-        # Flip sizes to account for rotation
-        s = super().sizeHint()
-        return QSize(s.height(), s.width())
+        if self.size_hint_cache is None:
+            # Flip sizes to account for rotation
+            s = super().sizeHint()
+            self.size_hint_cache = QSize(s.height(), s.width())
+        return self.size_hint_cache
 
     def minimumSizeHint(self):
-        # Flip sizes to account for rotation
-        s = super().minimumSizeHint()
-        return QSize(s.height(), s.width())
+        if self.min_size_hint_cache is None:
+            # Flip sizes to account for rotation
+            s = super().minimumSizeHint()
+            self.min_size_hint_cache = QSize(s.height(), s.width())
+        return self.min_size_hint_cache
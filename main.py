@@ -1,20 +1,40 @@
 import sys
-import argparse
-from window_manager import WindowManager
 
-parser = argparse.ArgumentParser(prog='PanelsOpener',
-                                 description='Open panels in new windows using references to entries in database')
-parser.add_argument('panelid', help="ID of the panel to open in a new window.")
-parser.add_argument('--create_new', '-c', help="Type of module to create and open a new instance of.")
 
-args = parser.parse_args()
+def parse_args(argv: list[str]) -> tuple[str, str] | tuple[str]:
+    """
+    Reads the panel id and optional type to create from the command line.
+
+    The common forms are read directly, as this runs every time a panel is opened. Anything else, including
+    requests for help, is handled by argparse.
+    :param argv: Command line arguments, including the program name.
+    :return: Tuple of the panel id, followed by the type of panel to create if one was given.
+    """
+    if len(argv) == 2 and not argv[1].startswith('-'):
+        return (argv[1],)
+    if len(argv) == 4 and not argv[1].startswith('-') and argv[2] in ('-c', '--create_new') \
+            and not argv[3].startswith('-'):
+        return (argv[1], argv[3])
+
+    import argparse
+    parser = argparse.ArgumentParser(prog='PanelsOpener',
+                                     description='Open panels in new windows using references to entries in database')
+    parser.add_argument('panelid', help="ID of the panel to open in a new window.")
+    parser.add_argument('--create_new', '-c', help="Type of module to create and open a new instance of.")
+    args = parser.parse_args(argv[1:])
 
-if __name__ == '__main__':
     if args.create_new is not None:
         # If creating a new panel, pass along its type
-        arg_tuple = (args.panelid, args.create_new)
+        return (args.panelid, args.create_new)
     else:
-        arg_tuple = (args.panelid,)
+        return (args.panelid,)
+
+
+if __name__ == '__main__':
+    arg_tuple = parse_args(sys.argv)
+
+    # Only import the manager once arguments are known to be valid
+    from window_manager import WindowManager
 
     # Attempt to start the application server on a certain name. Passes args to server if one already exists
     app = WindowManager("FLOATINGPANELSv0.1", "./panels.sqlite", sys.argv)
@@ -1,5 +1,8 @@
-from PySide6.QtCore import QEvent, Signal
-from PySide6.QtGui import Qt, QAction
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from PySide6.QtCore import QEvent, Signal, Slot
+from PySide6.QtGui import Qt, QAction, QPixmap
 from PySide6.QtWidgets import QWidget, QFrame, QApplication
 
 
@@ -19,6 +22,18 @@ class PanelWidget(QFrame):
     # Occurs when the user requests that this widget be removed from its parent. Pass itself
     request_remove = Signal(QWidget)
 
+    # Attribute names and SQLite definitions for this type. Read-only, as it is shared by every instance
+    ATTRIBUTES: MappingProxyType[str, str] = MappingProxyType({})
+    # Attribute names and initial values for new panels of this type. Read-only, as it is shared by every instance
+    DEFAULT_ATTRIBUTES: MappingProxyType[str, object] = MappingProxyType({})
+    # MIME format holding the type of a dragged panel, alongside its id as text
+    TYPE_MIME_FORMAT = "application/x-panel-type"
+    # Event types that indicate this widget is being closed
+    CLOSE_EVENTS = frozenset({QEvent.DeferredDelete, QEvent.Close})
+    # Distance in pixels the mouse must move before a drag starts. Read from the application on first use and
+    # refreshed when the style changes
+    drag_distance = None
+
     def __init__(self, name: str, manager, system_authority=False):
         super(PanelWidget, self).__init__()
 
@@ -36,6 +51,8 @@ class PanelWidget(QFrame):
         self.setContextMenuPolicy(Qt.NoContextMenu)
 
         self.dragStartPosition = None
+        self.revision = 0  # Counts changes to how this panel or its subpanels look, so stale drag images are redrawn
+        self.drag_pixmap_cache = None  # Size and revision of this panel at its last drag, and the image drawn then
 
     @staticmethod
     def panel_type() -> str:
@@ -45,21 +62,21 @@ class PanelWidget(QFrame):
         """
         raise NotImplementedError("Tried to get type of panels base class")
 
-    @staticmethod
-    def attributes() -> dict[str, str]:
+    @classmethod
+    def attributes(cls) -> Mapping[str, str]:
         """
         Gets dictionary of attributes to be formed in the database table
-        :return: Dictionary of attribute names and the SQLite definition
+        :return: Dictionary of attribute names and the SQLite definition. Must be treated as read-only
         """
-        return {}
+        return cls.ATTRIBUTES
 
-    @staticmethod
-    def default_attributes() -> dict[str, object]:
+    @classmethod
+    def default_attributes(cls) -> Mapping[str, object]:
         """
         Gets dictionary of initial attribute values for a new panel
-        :return: Dictionary of attribute names and the default value
+        :return: Dictionary of attribute names and the default value. Must be treated as read-only
         """
-        return {}
+        return cls.DEFAULT_ATTRIBUTES
 
     @staticmethod
     def allow_user_creation() -> bool:
@@ -72,10 +89,10 @@ class PanelWidget(QFrame):
 
     def eventFilter(self, source, event: QEvent) -> bool:
         # Announce when this panel is deleted by user
-        if event.type() == QEvent.DeferredDelete or event.type() == QEvent.Close:
+        if event.type() in self.CLOSE_EVENTS:
             self.closed.emit(self, self.name)
-        # Pass event to parent class
-        return super(QWidget, self).eventFilter(source, event)
+        # Never filter out events. The base class would also return False, so skip calling it
+        return False
 
     def init_from_dicts(self, attributes: dict[str, object], slots: dict[tuple[str, int], str | None]):
         """
@@ -84,6 +101,7 @@ class PanelWidget(QFrame):
         :param attributes: Attributes to update widget with.
         :param slots: Slots to update widget with.
         """
+        self.revision += 1
         if attributes is not None:
             self.fill_attributes(attributes)
         if slots is not None:
@@ -109,29 +127,32 @@ class PanelWidget(QFrame):
         Receive and pass on changes to this widget or its subpanels.
 
         :param path_to_panel: List of tuples representing the next slot to pass changes down to
-        :param attribute_dict: Dictionary of changes to the final panel's attributes
-        :param slots_dict: Dictionary of changes to the final panel's slots
-        """
-        if len(path_to_panel) == 0:
-            # If this is the destination, apply all changes
-            if attribute_dict is not None and len(attribute_dict) > 0:
-                self.fill_attributes(attribute_dict)
-            if slots_dict is not None and len(slots_dict) > 0:
-                self.fill_slots(slots_dict)
-        else:
-            # If this isn't the destination, move forward a step and pass that widget the rest of the path
-            next_step = path_to_panel[0]
-            self.get_slot_widget(next_step).pass_down_changes(path_to_panel[1:], attribute_dict, slots_dict)
+        :param attribute_dict: Dictionary of changes to the final panel's attributes. None if there are no changes
+        :param slots_dict: Dictionary of changes to the final panel's slots. None if there are no changes
+        """
+        # Follow each step of the path down to the destination. Each panel passed through contains the change
+        destination = self
+        destination.revision += 1
+        for step in path_to_panel:
+            destination = destination.get_slot_widget(step)
+            destination.revision += 1
+
+        # Apply all changes at the destination. Empty dictionaries are already replaced by None
+        if attribute_dict is not None:
+            destination.fill_attributes(attribute_dict)
+        if slots_dict is not None:
+            destination.fill_slots(slots_dict)
 
     def pass_to_db(self, attributes: dict[str, object] = None, slots: dict[tuple[str, int], str | None] = None):
         """
         Wrapper to pass updates to the manager to change the dictionary and all widgets.
 
+        Updates are queued and written together once control returns to the event loop.
         :param attributes: Dictionary of attribute updates
         :param slots: Dictionary of slot updates
         """
-        # Pass changes to manager
-        self.manager.update_panel(self, attributes, slots)
+        # Queue changes with manager
+        self.manager.queue_update(self, attributes, slots)
 
     def make_from_db(self, panelid: str):
         """
@@ -151,6 +172,33 @@ class PanelWidget(QFrame):
         """
         raise NotImplementedError("Get slot not implemented for this class")
 
+    @Slot()
+    def mark_changed(self):
+        """
+        Records that this panel looks different without having received an update, such as when a list is scrolled
+        or text is typed, so that its drag image and those of the panels holding it are redrawn.
+        """
+        widget = self
+        while widget is not None:
+            if isinstance(widget, PanelWidget):
+                widget.revision += 1
+            widget = widget.parentWidget()
+
+    def drag_image(self) -> QPixmap:
+        """
+        Gets an image of this panel to follow the cursor while it is dragged.
+
+        The image is only rendered again if the panel has been resized, updated, or marked changed since its last
+        drag.
+        :return: Pixmap of the panel as currently drawn
+        """
+        key = (self.width(), self.height(), self.revision)
+        if self.drag_pixmap_cache is None or self.drag_pixmap_cache[0] != key:
+            pixmap = QPixmap(self.size())
+            self.render(pixmap)
+            self.drag_pixmap_cache = (key, pixmap)
+        return self.drag_pixmap_cache[1]
+
     def lock(self, make_locked=True):
         """
         Sets lock value of the panel, determining whether it can be moved from its slot.
@@ -159,6 +207,12 @@ class PanelWidget(QFrame):
         """
         self.locked = make_locked
 
+    def changeEvent(self, e):
+        # Style changes may come with a new drag distance
+        if e.type() == QEvent.StyleChange:
+            PanelWidget.drag_distance = QApplication.startDragDistance()
+        super().changeEvent(e)
+
     def mousePressEvent(self, e):
         b = e.buttons()
         # Check for drag only if valid action is performed
@@ -172,17 +226,18 @@ class PanelWidget(QFrame):
 
     def mouseMoveEvent(self, e):
         b = e.buttons()
+        start = self.dragStartPosition
 
-        # Only process dragging while button held
-        if not((not self.locked and b == Qt.LeftButton) or b == Qt.RightButton):
+        # Only process dragging while button held, and don't do drag if start position not set
+        if start is None or not ((not self.locked and b == Qt.LeftButton) or b == Qt.RightButton):
             return
 
-        # Don't do drag if start position not set
-        if self.dragStartPosition is None:
-            return
+        if PanelWidget.drag_distance is None:
+            PanelWidget.drag_distance = QApplication.startDragDistance()
 
-        # Only process dragging once the mouse has moved far enough
-        if (e.pos() - self.dragStartPosition).manhattanLength() < QApplication.startDragDistance():
+        # Only process dragging once the mouse has moved far enough. Compare manhattan length using plain ints
+        pos = e.pos()
+        if abs(pos.x() - start.x()) + abs(pos.y() - start.y()) < PanelWidget.drag_distance:
             return
 
         if b == Qt.LeftButton:
@@ -1 +1,9 @@
-__all__ = ["simple_inputs", "types", "shelves", "time_manage"]
\ No newline at end of file
+from panels import simple_inputs, types, shelves, time_manage
+
+__all__ = ["simple_inputs", "types", "shelves", "time_manage", "PANEL_REGISTRY"]
+
+# Types of panels currently able to be created, stored under their type name. Built once at import
+PANEL_REGISTRY = {p.panel_type(): p for p in (shelves.PShelfVert, shelves.PShelfHoriz, simple_inputs.PTask,
+                                               simple_inputs.PNumber, types.PType, shelves.PFootnote, types.PCreator,
+                                               types.PFinder, time_manage.PCalendar, shelves.PMatrix)}
+# TODO: Load panel types automatically from installed scripts
@@ -119,14 +119,19 @@ class PMatrix(PanelWidget):
     def __init__(self, name: str, manager):
         super(PMatrix, self).__init__(name, manager)
 
+        # Hold off repaints until the grid is fully built
+        self.setUpdatesEnabled(False)
+
         self.grid = QGridLayout()
         self.dimx = 2
         self.dimy = 4
 
-        # Containers making up the grid
+        # Containers making up the grid, indexed by slot number. Cells are numbered row by row
+        self.cells = []
         for y in range(self.dimy):
             for x in range(self.dimx):
-                container = SingleContainer(self, 'cell.'+str(y)+'.'+str(x))
+                container = SingleContainer(self, 'cell', slot_num=y*self.dimx+x)
+                self.cells.append(container)
                 self.grid.addWidget(container, y, x)
 
         title = QLabel(name)
@@ -138,6 +143,7 @@ class PMatrix(PanelWidget):
         self.setLayout(layout)
         self.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
 
+        self.setUpdatesEnabled(True)
 
     @staticmethod
     def panel_type() -> str:
@@ -147,13 +153,13 @@ class PMatrix(PanelWidget):
         raise NotImplementedError("Matrices have no attributes")
 
     def fill_slots(self, slots: dict[tuple[str, int], str | None]):
-        for y in range(self.dimy):
-            for x in range(self.dimx):
-                self.grid.itemAtPosition(y, x).widget().update_from(slots)
+        # Only visit the cells that have changed
+        for slot, panelid in slots.items():
+            if slot[0] == 'cell':
+                self.cells[slot[1]].set_panel(panelid)
 
     def get_slot_widget(self, slot: tuple[str, int]) -> 'PanelWidget':
-        divided = slot[0].split('.')
-        if divided[0] == 'cell':
-            return self.grid.itemAtPosition(int(divided[1]), int(divided[2])).widget()
+        if slot[0] == 'cell':
+            return self.cells[slot[1]].get_panel_widget()
         else:
             raise Exception("No such slot")
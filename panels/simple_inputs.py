@@ -1,4 +1,6 @@
-from PySide6.QtCore import QSize
+from types import MappingProxyType
+
+from PySide6.QtCore import QSize, Slot
 from PySide6.QtWidgets import QSizePolicy, QLabel, QHBoxLayout, QPushButton, QSpinBox
 
 from panel_widget import PanelWidget
@@ -9,6 +11,15 @@ class PTask(PanelWidget):
     Panel that can be checked off to mark completion of a task. The name is displayed as the task.
     """
 
+    ATTRIBUTES = MappingProxyType({
+        "checked": "INTEGER"
+    })
+    DEFAULT_ATTRIBUTES = MappingProxyType({
+        "checked": False
+    })
+    # Button text for unchecked and checked states, indexed by checked value
+    CHECK_STATES = ("", "✅")
+
     def __init__(self, name, manager):
         super(PTask, self).__init__(name, manager)
 
@@ -22,7 +33,14 @@ class PTask(PanelWidget):
         layout.addWidget(self.text)
         self.setLayout(layout)
 
-        self.checkbox.pressed.connect(lambda: self.pass_to_db(attributes={"checked": not self.checkbox.text()}))
+        self.checkbox.pressed.connect(self.toggle_checked)
+
+    @Slot()
+    def toggle_checked(self):
+        """
+        Requests that the checked state of this task be flipped
+        """
+        self.pass_to_db(attributes={"checked": not self.checkbox.text()})
 
     def sizeHint(self) -> QSize:
         return QSize(40, 40)
@@ -31,22 +49,12 @@ class PTask(PanelWidget):
     def panel_type() -> str:
         return "task"
 
-    @staticmethod
-    def attributes() -> dict[str, str]:
-        return {
-            "checked": "INTEGER"
-        }
-
-    @staticmethod
-    def default_attributes() -> dict[str, object]:
-        return {
-            "checked": False
-        }
-
     def fill_attributes(self, attrs: dict[str, object]):
-        if "checked" in attrs.keys():
-            # Handle toggle of checkbox
-            self.checkbox.setText("✅" if bool(attrs["checked"]) else "")
+        if "checked" in attrs:
+            # Handle toggle of checkbox. Only set text on change, as setting it causes a repaint
+            new_text = self.CHECK_STATES[1 if attrs["checked"] else 0]
+            if self.checkbox.text() != new_text:
+                self.checkbox.setText(new_text)
 
     def fill_slots(self, slots: dict[tuple[str, int], str | None]):
         raise NotImplementedError("Tasks have no slots; cannot fill")
@@ -60,6 +68,13 @@ class PNumber(PanelWidget):
     Panel containing a number whose value can be adjusted,
     """
 
+    ATTRIBUTES = MappingProxyType({
+        "value": "INTEGER"
+    })
+    DEFAULT_ATTRIBUTES = MappingProxyType({
+        "value": 0
+    })
+
     def __init__(self, name, manager):
         super(PNumber, self).__init__(name, manager)
 
@@ -67,13 +82,27 @@ class PNumber(PanelWidget):
 
         self.num = QSpinBox()
         self.num.setRange(-(10**8), 10**8)
+        # Only signal once editing is finished rather than on every keystroke
+        self.num.setKeyboardTracking(False)
         self.text = QLabel(name)
+        self.stored_value = None  # Value last read from the database
         layout = QHBoxLayout()
         layout.addWidget(self.text)
         layout.addWidget(self.num)
         self.setLayout(layout)
 
-        self.num.editingFinished.connect(lambda: self.pass_to_db(attributes={"value": self.num.value()}))
+        self.num.editingFinished.connect(self.submit_value)
+        # Typed text shows before it is submitted
+        self.num.textChanged.connect(self.mark_changed)
+
+    @Slot()
+    def submit_value(self):
+        """
+        Requests that the value entered in the spin box be stored
+        """
+        # Editing also finishes when focus is lost, often without any change to store
+        if self.num.value() != self.stored_value:
+            self.pass_to_db(attributes={"value": self.num.value()})
 
     def sizeHint(self) -> QSize:
         return QSize(40, 40)
@@ -82,22 +111,15 @@ class PNumber(PanelWidget):
     def panel_type() -> str:
         return "number"
 
-    @staticmethod
-    def attributes() -> dict[str, str]:
-        return {
-            "value": "INTEGER"
-        }
-
-    @staticmethod
-    def default_attributes() -> dict[str, object]:
-        return {
-            "value": 0
-        }
-
     def fill_attributes(self, attrs: dict[str, object]):
-        if "value" in attrs.keys():
+        if "value" in attrs:
+            self.stored_value = attrs["value"]
             # Handle change in value
-            self.num.setValue(attrs["value"])
+            if self.num.value() != attrs["value"]:
+                # Value came from the database, so don't echo it back through signals
+                self.num.blockSignals(True)
+                self.num.setValue(attrs["value"])
+                self.num.blockSignals(False)
 
     def fill_slots(self, slots: dict[tuple[str, int], str | None]):
         raise NotImplementedError("Numbers have no slots; cannot fill")
@@ -1,7 +1,9 @@
-from PySide6.QtCore import QDate
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from PySide6.QtCore import QDate, Slot
 from PySide6.QtGui import Qt
-from PySide6.QtWidgets import QGridLayout, QPushButton, QLineEdit, QSpinBox, QVBoxLayout, QHBoxLayout, QLabel, QFrame, \
-    QSizePolicy
+from PySide6.QtWidgets import QGridLayout, QPushButton, QSpinBox, QVBoxLayout, QHBoxLayout, QLabel, QSizePolicy
 
 from panel_widget import PanelWidget
 from slot_containers import SingleContainer
@@ -12,19 +14,35 @@ class PCalendar(PanelWidget):
     Panel that creates a calendar for a given month, with a new panel for each day
     """
 
+    ATTRIBUTES = MappingProxyType({
+        "month": "INTEGER",
+        "year": "INTEGER"
+    })
+    # Date formats for the month title and for the ids of generated day panels
+    TITLE_FORMAT = "MMMM yyyy"
+    DAY_ID_FORMAT = "d-MMM-yyyy"
 
     def __init__(self, name: str, manager):
         super(PCalendar, self).__init__(name, manager)
 
+        # Hold off repaints until the grid is fully built
+        self.setUpdatesEnabled(False)
+
         self.daily_type = SingleContainer(self, "daily_type", allowed_types={"type"})
 
 
         self.month_edit = QSpinBox()
         self.month_edit.setRange(1, 12)
-        self.month_edit.editingFinished.connect(lambda: self.pass_to_db(attributes={"month": self.month_edit.value()}))
+        self.month_edit.setKeyboardTracking(False)
+        self.month_edit.editingFinished.connect(self.submit_month)
         self.year_edit = QSpinBox()
         self.year_edit.setRange(2000, 2100)
-        self.year_edit.editingFinished.connect(lambda: self.pass_to_db(attributes={"year": self.year_edit.value()}))
+        self.year_edit.setKeyboardTracking(False)
+        self.year_edit.editingFinished.connect(self.submit_year)
+        self.stored_attributes = {}  # Month and year last read from the database
+        # Typed text shows before it is submitted
+        self.month_edit.textChanged.connect(self.mark_changed)
+        self.year_edit.textChanged.connect(self.mark_changed)
 
         self.generate_button = QPushButton("⏬")
         self.generate_button.pressed.connect(self.generate_month)
@@ -34,11 +52,14 @@ class PCalendar(PanelWidget):
         self.month_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Maximum)
 
         self.grid = QGridLayout()
+        # Containers for each day, indexed by slot number
+        self.day_cells = []
         for i in range(6):
             for j in range(7):
                 day_frame = SingleContainer(self, "day", slot_num=i*7+j, drags=False, drops=False)
                 #day_frame.setFixedSize(200, 300)
                 self.grid.addWidget(day_frame, i, j)
+                self.day_cells.append(day_frame)
 
         setting_row = QHBoxLayout()
         setting_row.addWidget(QLabel("Month:"))
@@ -57,19 +78,32 @@ class PCalendar(PanelWidget):
         layout.addLayout(self.grid)
         self.setLayout(layout)
 
+        self.setUpdatesEnabled(True)
+
+    @Slot()
+    def submit_month(self):
+        """
+        Requests that the month entered in the spin box be stored
+        """
+        # Editing also finishes when focus is lost, often without any change to store
+        if self.month_edit.value() != self.stored_attributes.get("month"):
+            self.pass_to_db(attributes={"month": self.month_edit.value()})
+
+    @Slot()
+    def submit_year(self):
+        """
+        Requests that the year entered in the spin box be stored
+        """
+        if self.year_edit.value() != self.stored_attributes.get("year"):
+            self.pass_to_db(attributes={"year": self.year_edit.value()})
+
     @staticmethod
     def panel_type() -> str:
         return "calendar"
 
-    @staticmethod
-    def attributes() -> dict[str, str]:
-        return {
-            "month": "INTEGER",
-            "year": "INTEGER"
-        }
-
-    @staticmethod
-    def default_attributes() -> dict[str, object]:
+    @classmethod
+    def default_attributes(cls) -> Mapping[str, object]:
+        # Defaults depend on the current date, so can't be stored as a constant
         right_now = QDate.currentDate()
         return {
             "month": right_now.month(),
@@ -77,24 +111,32 @@ class PCalendar(PanelWidget):
         }
 
     def fill_attributes(self, attrs: dict[str, object]):
-        if "month" in attrs.keys():
+        self.stored_attributes.update(attrs)
+        # Values came from the database, so don't echo them back through signals. Skip values already shown
+        if "month" in attrs and self.month_edit.value() != attrs["month"]:
+            self.month_edit.blockSignals(True)
             self.month_edit.setValue(attrs["month"])
-        if "year" in attrs.keys():
+            self.month_edit.blockSignals(False)
+        if "year" in attrs and self.year_edit.value() != attrs["year"]:
+            self.year_edit.blockSignals(True)
             self.year_edit.setValue(attrs["year"])
+            self.year_edit.blockSignals(False)
 
     def fill_slots(self, slots: dict[tuple[str, int], str | None]):
         self.daily_type.update_from(slots)
-        for x in range(self.grid.rowCount()):
-            for y in range(self.grid.columnCount()):
-                self.grid.itemAtPosition(x, y).widget().update_from(slots)
+        # Only visit the days that have changed
+        for slot, panelid in slots.items():
+            if slot[0] == 'day':
+                self.day_cells[slot[1]].set_panel(panelid)
 
     def get_slot_widget(self, slot: tuple[str, int]) -> 'PanelWidget':
-        if slot[0] == 'daily_type':
-            return self.daily_type.get_panel_widget()
-        elif slot[0] == 'day':
-            return self.grid.itemAtPosition(slot[1] // 7, slot[1] % 7).widget().get_panel_widget()
-        else:
-            raise Exception("No such slot")
+        match slot[0]:
+            case 'daily_type':
+                return self.daily_type.get_panel_widget()
+            case 'day':
+                return self.day_cells[slot[1]].get_panel_widget()
+            case _:
+                raise Exception("No such slot")
 
     def day_to_cell(self, day: int) -> tuple[int, int]:
         first = QDate(self.year_edit.value(), self.month_edit.value(), 1)
@@ -103,14 +145,24 @@ class PCalendar(PanelWidget):
         return true_day // 7, true_day % 7
 
     def generate_month(self):
+        """
+        Fills the calendar with a panel for each day of the chosen month, creating any that don't exist yet.
+        """
         date = QDate(self.year_edit.value(), self.month_edit.value(), 1)
-        self.month_label.setText(date.toString("MMMM yyyy"))
-        updates_dict = {("day", x): None for x in range(42)}
+        self.month_label.setText(date.toString(self.TITLE_FORMAT))
+        day_ids = [None] * 42  # Panel for each day slot. Slots outside the month are cleared
+        missing = []  # Days that don't have a panel yet, created together once all are found
+        # Same offset as day_to_cell, found once for the whole month
+        first_offset = date.dayOfWeek() % 7
         for i in range(date.daysInMonth()):
-            id_str = self.name + "/" + date.addDays(i).toString("d-MMM-yyyy")
-            cell = self.day_to_cell(i + 1)
-            idx = cell[0] * 7 + cell[1]
+            id_str = self.name + "/" + date.addDays(i).toString(self.DAY_ID_FORMAT)
             if self.manager.type_of_panel(id_str) is None:
-                self.manager.invent_panel(id_str, self.daily_type.get_panel_widget().name)
-            updates_dict[("day", idx)] = id_str
-        self.pass_to_db(slots=updates_dict)
\ No newline at end of file
+                missing.append(id_str)
+            day_ids[i + first_offset] = id_str
+        if len(missing) > 0:
+            # Type is only needed to create days
+            type_widget = self.daily_type.get_panel_widget()
+            if type_widget is None:
+                raise Exception("No type given for calendar days")
+            self.manager.invent_panels([(id_str, type_widget.name) for id_str in missing])
+        self.pass_to_db(slots={("day", idx): id_str for idx, id_str in enumerate(day_ids)})
@@ -1,4 +1,4 @@
-from PySide6.QtCore import QSize
+from PySide6.QtCore import QSize, QTimer
 from PySide6.QtWidgets import QSizePolicy, QLabel, QHBoxLayout, QVBoxLayout, QPushButton, QLineEdit
 
 from panel_widget import PanelWidget
@@ -54,6 +54,8 @@ class PCreator(PanelWidget):
         create_button = QPushButton("⬇")
         create_button.pressed.connect(self.create_panel)
         self.id_edit = QLineEdit()
+        # Typed text shows before a panel is created from it
+        self.id_edit.textChanged.connect(self.mark_changed)
 
         layout = QVBoxLayout()
         layout.addWidget(self.type_to_make)
@@ -88,12 +90,13 @@ class PCreator(PanelWidget):
         self.result.update_from(slots)
 
     def get_slot_widget(self, slot: tuple[str, int]) -> 'PanelWidget':
-        if slot[0] == 'type_to_make':
-            return self.type_to_make.get_panel_widget()
-        elif slot[0] == 'result':
-            return self.result.get_panel_widget()
-        else:
-            raise Exception("No such slot")
+        match slot[0]:
+            case 'type_to_make':
+                return self.type_to_make.get_panel_widget()
+            case 'result':
+                return self.result.get_panel_widget()
+            case _:
+                raise Exception("No such slot")
 
 
 class PFinder(PanelWidget):
@@ -109,8 +112,14 @@ class PFinder(PanelWidget):
         self.results = ListContainer(self, 'result', drops=False)
         self.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Expanding)
 
+        # Rapid refresh requests are combined into a single refresh once they stop
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(50)
+        self.refresh_timer.timeout.connect(self.generate_list)
+
         refresh_button = QPushButton("🔄")
-        refresh_button.pressed.connect(self.generate_list)
+        refresh_button.pressed.connect(self.refresh_timer.start)
 
         layout = QVBoxLayout()
         layout.addWidget(self.type_to_find)
@@ -127,10 +136,10 @@ class PFinder(PanelWidget):
         Clears and regenerates the list of panels according to the type
         in the type slot
         """
+        # Entries to clear are counted from the layout, so it must first reflect any updates still queued
+        self.manager.flush_updates()
+
         updates = {}
-        # First, clear all current entries of the list by default
-        for x in range(self.results.num_entries()):
-            updates[("result", x)] = None
 
         # Get type from slot
         curr_type_wid = self.type_to_find.get_panel_widget()
@@ -142,6 +151,10 @@ class PFinder(PanelWidget):
             for i, x in enumerate(ids):
                 updates[("result", i)] = x
 
+        # Clear any current entries past the end of the new results
+        for x in range(len(updates), self.results.num_entries()):
+            updates[("result", x)] = None
+
         self.manager.update_panel(self, None, slots_dict=updates)
 
     def fill_attributes(self, attrs: dict[str, object]):
@@ -152,9 +165,10 @@ class PFinder(PanelWidget):
         self.results.update_from(slots)
 
     def get_slot_widget(self, slot: tuple[str, int]) -> 'PanelWidget':
-        if slot[0] == 'type_to_find':
-            return self.type_to_find.get_panel_widget()
-        elif slot[0] == 'result':
-            return self.results.panel_widget_at(slot[1])
-        else:
-            raise Exception("No such slot")
+        match slot[0]:
+            case 'type_to_find':
+                return self.type_to_find.get_panel_widget()
+            case 'result':
+                return self.results.panel_widget_at(slot[1])
+            case _:
+                raise Exception("No such slot")
@@ -1,3 +1,6 @@
+import json
+import struct
+
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import QByteArray, Signal
 from PySide6.QtNetwork import QLocalSocket, QLocalServer
@@ -16,8 +19,8 @@ class SingleApplication(QApplication):
     picked = Signal()
     # Signal emitted when this application receives arguments from an attempted instance
     args_received = Signal(tuple)
-    # Separator used between arguments passed between instances
-    SEPARATOR = ';;'
+    # Format of the header giving the byte length of each message. Four bytes, big-endian
+    HEADER = struct.Struct(">I")
 
     def __init__(self, sid: str, *argv):
         super(SingleApplication, self).__init__(*argv)
@@ -25,6 +28,7 @@ class SingleApplication(QApplication):
         self.sid = sid  # Name to run the server on
         self.server = None
         self.in_socket = None
+        self.in_buffer = bytearray()  # Bytes received so far from the current instance
         self.pass_args = None
 
         self.running = 0  # 1 if running server, -1 if passing arguments, 0 if undecided
@@ -48,10 +52,14 @@ class SingleApplication(QApplication):
         Handles case where an already-running server is found
         """
         # Encode arguments as data to pass
-        full_str = self.SEPARATOR.join(self.pass_args)
-        # Pass arguments to server
-        self.out_socket.write(QByteArray(full_str.encode()))
-        self.out_socket.waitForBytesWritten(1000)
+        data = json.dumps(self.pass_args).encode()
+        # Pass arguments to server, preceded by their length so the server knows when all have arrived
+        self.out_socket.write(QByteArray(self.HEADER.pack(len(data)) + data))
+        # Write without waiting. A local socket normally takes the whole message at once. This instance exits
+        # without running an event loop, so only wait if some of the message is still left to write
+        self.out_socket.flush()
+        if self.out_socket.bytesToWrite() > 0:
+            self.out_socket.waitForBytesWritten(1000)
         self.running = -1
 
     def not_found(self, err):
@@ -78,15 +86,23 @@ class SingleApplication(QApplication):
         """
         # Connect signals to respond when data is received
         self.in_socket = self.server.nextPendingConnection()
+        self.in_buffer = bytearray()
         self.in_socket.readyRead.connect(self.receive_message)
 
     def receive_message(self):
         """
         Handler for data received from new instance
         """
-        # Receive and decode arguments passed
-        msg = bytes(self.in_socket.readAll()).decode()
-        msg_tuple = tuple(msg.split(self.SEPARATOR))
+        # Data may arrive in pieces. Wait until the whole message is received
+        self.in_buffer += bytes(self.in_socket.readAll())
+        if len(self.in_buffer) < self.HEADER.size:
+            return
+        end = self.HEADER.size + self.HEADER.unpack_from(self.in_buffer)[0]
+        if len(self.in_buffer) < end:
+            return
+
+        # Decode arguments passed
+        msg_tuple = tuple(json.loads(self.in_buffer[self.HEADER.size:end].decode()))
         # Disconnect from other instance
         self.in_socket.readyRead.disconnect(self.receive_message)
         # Announce the arguments
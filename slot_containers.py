@@ -1,4 +1,4 @@
-from PySide6.QtCore import QSize
+from PySide6.QtCore import QSize, QMimeData
 from PySide6.QtGui import Qt
 from PySide6.QtWidgets import QFrame, QVBoxLayout, QWidget, QScrollArea, QHBoxLayout
 
@@ -17,6 +17,7 @@ class SlotContainer(QFrame):
         self.allowed_types = allowed_types  # Types of panels allowed to fill this slot
         self.drops = drops  # Whether panels can be dropped into this slot
         self.drags = drags  # Whether panels can be dragged out of this slot
+        self.last_accept = (None, False)  # Last panelid checked during the current drag, and whether it was accepted
         self.setFrameStyle(QFrame.Panel | QFrame.Plain)
 
     def update_from(self, idx_to_id: dict[tuple[str, int], str | None]):
@@ -27,15 +28,32 @@ class SlotContainer(QFrame):
         """
         raise Exception("Update not implemented in base class")
 
-    def can_accept(self, panelid: str) -> bool:
+    def can_accept(self, mime: QMimeData) -> bool:
         """
-        Returns whether the given panelid can be added to this panel by the user
+        Returns whether the panel being dropped can be added to this panel by the user
 
-        :param panelid: ID to check for acceptance
-        :return: Whether the ID can be added
+        :param mime: MIME data of the drop, holding the panel id as text
+        :return: Whether the panel can be added
         """
-        return self.drops and (self.allowed_types is None
-                               or self.parent_panel.manager.type_of_panel(panelid) in self.allowed_types)
+        panelid = mime.text()
+        # The same panel is checked on entering and on dropping, so reuse the result within a drag
+        if panelid == self.last_accept[0]:
+            return self.last_accept[1]
+        if not self.drops:
+            accepted = False
+        elif self.allowed_types is None:
+            accepted = True
+        elif mime.hasFormat(PanelWidget.TYPE_MIME_FORMAT):
+            # Panels dragged within the program carry their type, so it doesn't need to be looked up
+            accepted = mime.data(PanelWidget.TYPE_MIME_FORMAT).data().decode() in self.allowed_types
+        else:
+            accepted = self.parent_panel.manager.type_of_panel(panelid) in self.allowed_types
+        self.last_accept = (panelid, accepted)
+        return accepted
+
+    def dragLeaveEvent(self, e):
+        # Drag is over for this container, so forget its result
+        self.last_accept = (None, False)
 
 
 class SingleContainer(SlotContainer):
@@ -70,25 +88,28 @@ class SingleContainer(SlotContainer):
     def dragEnterEvent(self, e):
         # Accept drags with text, as these hold panel id
         # Check that the id is allowed
-        if e.mimeData().hasText() and self.can_accept(e.mimeData().text()):
+        if e.mimeData().hasText() and self.can_accept(e.mimeData()):
             e.accept()
 
     def dropEvent(self, e):
         panelid = e.mimeData().text()
 
         # Check if this drop can be accepted
-        if not self.can_accept(panelid):
+        if not self.can_accept(e.mimeData()):
             return
 
         # Request addition from parent
         self.parent_panel.pass_to_db(slots={(self.slot_name, self.slot_num): panelid})
 
-        # Confirm the drop
+        # Confirm the drop and forget the result for this drag
+        self.last_accept = (None, False)
         e.accept()
 
-    def request_removal(self):
+    def request_removal(self, w: PanelWidget = None):
         """
         Requests that the parent remove the panel from this container
+
+        :param w: Widget that wants to be removed. Unused, as the container only holds one panel
         """
         # Request removal from parent
         self.parent_panel.pass_to_db(slots={(self.slot_name, self.slot_num): None})
@@ -97,29 +118,31 @@ class SingleContainer(SlotContainer):
         key = (self.slot_name, self.slot_num)
         # Search in update dict for the key
         if key in idx_to_id:
-            panelid = idx_to_id[key]
-            if panelid is None:
-                # Remove from layout if indicated
-                wid = self.get_panel_widget()
-                if wid is not None:
-                    self.layout.removeWidget(wid)
-                    wid.setParent(None)
+            self.set_panel(idx_to_id[key])
 
-            else:
-                # Check if there's already a panel in this slot before adding new one
-                if self.get_panel_widget() is not None:
-                    # Remove current from layout to make room
-                    wid = self.get_panel_widget()
-                    self.layout.removeWidget(wid)
-                    wid.setParent(None)
+    def set_panel(self, panelid: str | None):
+        """
+        Apply a single update to the panel held in this container
 
+        :param panelid: ID of the panel that must fill the container. None indicates removal
+        """
+        # Hold off repaints until the old panel is removed and the new one is added
+        self.setUpdatesEnabled(False)
+        try:
+            # Remove the current panel, whether or not it is being replaced. It is always the only item in the layout
+            if self.layout.count() > 0:
+                self.layout.takeAt(0).widget().setParent(None)
+
+            if panelid is not None:
                 # Create widget and add to layout if indicated
                 new_widget = self.parent_panel.make_from_db(panelid)
-                new_widget.request_remove.connect(lambda x: self.request_removal())
+                new_widget.request_remove.connect(self.request_removal)
                 # If dragging out is disabled, lock the panel in
                 if not self.drags:
                     new_widget.lock()
                 self.layout.addWidget(new_widget)
+        finally:
+            self.setUpdatesEnabled(True)
 
 
 class ListContainer(SlotContainer):
@@ -144,6 +167,9 @@ class ListContainer(SlotContainer):
         scroll.setWidget(container)
         scroll.setWidgetResizable(True)
         scroll.setFrameShape(QFrame.NoFrame)
+        # Scrolling changes how the parent panel looks
+        scroll.horizontalScrollBar().valueChanged.connect(parent_panel.mark_changed)
+        scroll.verticalScrollBar().valueChanged.connect(parent_panel.mark_changed)
         layout = QVBoxLayout()
         layout.addWidget(scroll)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -168,66 +194,71 @@ class ListContainer(SlotContainer):
         return self.container_layout.itemAt(idx).widget()
 
     def update_from(self, idx_to_id: dict[tuple[str, int], str | None]):
+        # Updates for this container, keyed by slot number alone
+        updates = {slot[1]: panelid for slot, panelid in idx_to_id.items() if slot[0] == self.slot_name}
+        # Panels pass all of their slot changes to each container, so most often none are for this one
+        if len(updates) == 0:
+            return
 
-        # First: skip first few widgets until one needs to be changed. Then remove all the remaining widgets
-        # Removal is to simplify the update algorithm. The beginning widgets are excluded because, in the
-        # common operations of addition and deletion, they will not change.
-        existing_widgets = {}  # Widgets already in the layout that just need to be moved
-        do_remove = False  # Switches to true when widgets must start being removed
-        removed_order = []  # Original order of removed widgets, in case they aren't replaced
-        insert_idx = -1  # Index that new widgets must start inserting relative to
-        for idx in range(self.container_layout.count()):
-            # Iterate through widgets in layout in order
-            if not do_remove and (self.slot_name, idx) in idx_to_id.keys():
-                # If this is the first slot receiving an update, start removing now
-                do_remove = True
-                insert_idx = idx
-            if do_remove:
-                # Mark widget removed, as an update has already occurred earlier in the list
-                wid = self.panel_widget_at(idx)
-                existing_widgets[wid.name] = wid
-                removed_order.append(wid)
-
-        # Remove the widgets from the layout
-        for wid in removed_order:
-            self.container_layout.removeWidget(wid)
-            wid.setParent(None)
-
-        # Default to inserting updates at the end, if no slots were overwritten
-        if insert_idx < 0:
-            insert_idx = self.container_layout.count()
-
-        unaddressed = {x for x in idx_to_id.keys() if x[0] == self.slot_name}  # Set of slots that still need changes
-        new_idx = insert_idx  # Tracks list as it is iterated for updates, starting at the removal point
-        # Iterate list positions
-        while len(unaddressed) > 0:
-            slot = (self.slot_name, new_idx)
-            if slot in idx_to_id.keys():
-                # If this slot has an update, put the panel in its place
-                new_panelid = idx_to_id[slot]
-                if new_panelid is None:
-                    # Panel was removed and no replacement is needed
-                    pass
-                elif new_panelid not in existing_widgets.keys():
-                    # New panel widget must be created and inserted from database
-                    new_widget = self.parent_panel.make_from_db(new_panelid)
-                    new_widget.request_remove.connect(self.request_removal)
-                    if not self.drags:
-                        new_widget.lock()
-                    self.container_layout.insertWidget(new_idx, new_widget)
-                else:
-                    # Panel was already in the container; add its widget back at new position
-                    wid = existing_widgets.pop(new_panelid)
-                    self.container_layout.insertWidget(new_idx, wid)
-
-                unaddressed.remove(slot)
-            elif new_idx - insert_idx < len(removed_order):
-                # If slot has no update, put its original widget back in
-                self.container_layout.insertWidget(new_idx, removed_order[new_idx - insert_idx])
+        # Read the widgets out of the layout once, rather than querying it at every step
+        widgets = [self.panel_widget_at(idx) for idx in range(self.container_layout.count())]
+        current = [wid.name for wid in widgets]
+
+        # Form the list of panels held once the updates are applied. Slots without an update keep their panel
+        target = []
+        for idx in range(max(len(current), max(updates, default=-1) + 1)):
+            if idx in updates:
+                target.append(updates[idx])
+            elif idx < len(current):
+                target.append(current[idx])
             else:
                 # Exception raised when insertions to end of list skip an index
                 raise Exception("Index was skipped over in list slot")
-            new_idx += 1
+        # Removed panels leave no gap in the list
+        target = [panelid for panelid in target if panelid is not None]
+        if target == current:
+            return
+
+        # Only the run of slots between the unchanged start and unchanged end of the list needs to change. In the
+        # common operations of addition and deletion, this is a single slot
+        first = 0
+        while first < len(current) and first < len(target) and current[first] == target[first]:
+            first += 1
+        end_current = len(current)  # End of the changed run in the current list
+        end_target = len(target)  # End of the changed run in the updated list
+        while end_current > first and end_target > first and current[end_current - 1] == target[end_target - 1]:
+            end_current -= 1
+            end_target -= 1
+
+        # Hold off repaints until the whole list is rearranged
+        self.setUpdatesEnabled(False)
+        try:
+            # Take the changed run out of the layout. Its widgets are reused if their panel is still in the list
+            existing_widgets = {}
+            for wid in widgets[first:end_current]:
+                self.container_layout.takeAt(first)
+                existing_widgets.setdefault(wid.name, []).append(wid)
+
+            # Insert the updated run in order
+            for idx in range(first, end_target):
+                new_panelid = target[idx]
+                if existing_widgets.get(new_panelid):
+                    # Panel was already in the container; add its widget back at new position
+                    wid = existing_widgets[new_panelid].pop()
+                else:
+                    # New panel widget must be created and inserted from database
+                    wid = self.parent_panel.make_from_db(new_panelid)
+                    wid.request_remove.connect(self.request_removal)
+                    if not self.drags:
+                        wid.lock()
+                self.container_layout.insertWidget(idx, wid)
+
+            # Discard widgets whose panels are no longer in the list
+            for removed in existing_widgets.values():
+                for wid in removed:
+                    wid.setParent(None)
+        finally:
+            self.setUpdatesEnabled(True)
 
     def request_removal(self, w: PanelWidget):
         """
@@ -235,9 +266,16 @@ class ListContainer(SlotContainer):
 
         :param w: Widget that wants to be removed
         """
+        # Shifts are found from the layout, so it must first reflect any updates still queued
+        self.parent_panel.manager.flush_updates()
+        removal_idx = self.container_layout.indexOf(w)
+        if removal_idx < 0:
+            # Widget was already removed by the queued updates
+            return
+
         updates = {}  # Dictionary of slot updates to pass to manager
         # Iterate over all widgets after the removal point
-        for i in range(self.container_layout.indexOf(w)+1, self.container_layout.count()):
+        for i in range(removal_idx+1, self.container_layout.count()):
             # Add update to shift each widget after removal point one spot earlier
             updates[(self.slot_name, i-1)] = self.panel_widget_at(i).name
         # Delete the last slot, as the length of the list has reduced by one
@@ -249,6 +287,7 @@ class ListContainer(SlotContainer):
         """
         Asks the manager to add a new panel to the list.
 
+        No updates to this list may still be queued, as the shifts are found from the current layout.
         :param panelid: ID of panel to be inserted
         :param idx: Index to insert at
         """
@@ -264,7 +303,7 @@ class ListContainer(SlotContainer):
     def dragEnterEvent(self, e):
         # Accept drags with text, as these hold panel id
         # Check that the id is allowed
-        if e.mimeData().hasText() and self.can_accept(e.mimeData().text()):
+        if e.mimeData().hasText() and self.can_accept(e.mimeData()):
             e.accept()
 
     def dropEvent(self, e):
@@ -273,9 +312,12 @@ class ListContainer(SlotContainer):
         panelid = e.mimeData().text()
 
         # Check if this drop can be accepted
-        if not self.can_accept(panelid):
+        if not self.can_accept(e.mimeData()):
             return
 
+        # Insertion index and shifts are found from the layout, so it must first reflect any updates still queued
+        self.parent_panel.manager.flush_updates()
+
         # Check each position to find index
         for n in range(self.container_layout.count()):
             w = self.panel_widget_at(n)
@@ -294,5 +336,6 @@ class ListContainer(SlotContainer):
         # If no position is found, add to end of list
         if not added:
             self.request_addition(panelid, self.container_layout.count())
-        # Confirm the drop
+        # Confirm the drop and forget the result for this drag
+        self.last_accept = (None, False)
         e.accept()
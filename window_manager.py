@@ -1,11 +1,10 @@
+import functools
 import sqlite3
-import types
 
-from PySide6.QtCore import QMimeData, QPoint
-from PySide6.QtGui import QDrag, QPixmap, Qt, QCursor
+from PySide6.QtCore import QMimeData, QPoint, QTimer
+from PySide6.QtGui import QDrag, Qt, QCursor
 
 from panel_widget import PanelWidget
-from panels import *
 from single_application import SingleApplication
 
 
@@ -16,16 +15,91 @@ def open_db(filepath: str) -> sqlite3.Connection:
     :param filepath: Path to file that database is already at or should be placed at.
     :return: SQLite connection to the database.
     """
-    con = sqlite3.connect(filepath)
+    # Keep more compiled statements than the default 128, as each type's attribute table has its own statements
+    con = sqlite3.connect(filepath, cached_statements=256)
+    # Write-ahead log with NORMAL sync is much faster for frequent small writes. A power loss may drop the last few
+    # commits, but cannot corrupt the database
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA temp_store=MEMORY")
+    con.execute("PRAGMA mmap_size=268435456")
+    con.execute("PRAGMA cache_size=-20000")
     # Create table for panel metadata
     con.execute("CREATE TABLE IF NOT EXISTS Panels (id TEXT PRIMARY KEY, module TEXT)")
     # Create table for slot hierarchy
     con.execute("CREATE TABLE IF NOT EXISTS Slots (parent TEXT REFERENCES Panels(id), slot_name TEXT NOT NULL, slot_num"
                 " INTEGER, child TEXT REFERENCES Panels(id), PRIMARY KEY(parent, slot_name, slot_num))")
+    # The primary key already indexes slots by parent. Index by child to find the panels holding a panel
+    con.execute("CREATE INDEX IF NOT EXISTS SlotsByChild ON Slots(child)")
+    # Index panels by type to list every panel of a type, and to find the 'type' panels themselves
+    con.execute("CREATE INDEX IF NOT EXISTS PanelsByModule ON Panels(module)")
+    migrate_db(con)
     con.row_factory = sqlite3.Row
     return con
 
 
+def migrate_db(con: sqlite3.Connection):
+    """
+    Upgrades a database made by an older version to the current layout. The version is stored in user_version.
+
+    :param con: SQLite connection to the database.
+    """
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        # The version is only raised if the slots are converted, as both are committed together
+        with con:
+            # Matrix cells were stored under slot names of the form 'cell.row.column'. Store them in the 'cell' slot
+            # instead, numbered row by row across the matrix's two columns
+            con.execute("UPDATE Slots SET slot_name = 'cell', "
+                        "slot_num = 2 * CAST(substr(slot_name, 6, instr(substr(slot_name, 6), '.') - 1) AS INTEGER) "
+                        "+ CAST(substr(slot_name, 6 + instr(substr(slot_name, 6), '.')) AS INTEGER) "
+                        "WHERE slot_name LIKE 'cell.%' AND parent IN (SELECT id FROM Panels WHERE module = 'matrix')")
+            con.execute("PRAGMA user_version = 1")
+
+
+# Statements that don't depend on a panel type. Each query is always run with the same string, so SQLite only
+# compiles it once and reuses it from the connection's statement cache
+PANEL_INSERT_SQL = "INSERT INTO Panels VALUES (?, ?)"
+PANEL_TYPE_SQL = "SELECT module FROM Panels WHERE id = ?"
+PANELS_OF_TYPE_SQL = "SELECT id FROM Panels WHERE module = ?"
+TYPE_PANEL_SQL = "SELECT * FROM Panels WHERE module = 'type' AND id = ?"
+TABLE_EXISTS_SQL = "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?"
+SLOTS_OF_PANEL_SQL = "SELECT * FROM Slots WHERE parent = ?"
+SLOT_DELETE_SQL = "DELETE FROM Slots WHERE (parent, slot_name, slot_num) = (?,?,?)"
+# Finds all panels above a target by walking up the slot table, then returns the slots they hold on the way down
+SLOTS_ABOVE_SQL = ("WITH RECURSIVE Above(name) AS ( "
+                   "SELECT ? "
+                   "UNION "
+                   "SELECT Slots.parent FROM Slots JOIN Above ON Slots.child = Above.name) "
+                   "SELECT parent, slot_name, slot_num, child FROM Slots "
+                   "WHERE child IN (SELECT name FROM Above)")
+
+# Most slot rows written by a single statement. Keeps the bound variables under SQLite's lowest limit of 999
+SLOT_ROWS_PER_STATEMENT = 200
+
+
+@functools.lru_cache(maxsize=None)
+def slot_upsert_statement(num_rows: int) -> str:
+    """
+    Forms a statement that inserts or replaces several slot rows at once.
+
+    :param num_rows: Number of slot rows the statement writes.
+    :return: SQL statement taking four parameters for each row.
+    """
+    return ("INSERT INTO Slots VALUES " + ",".join(["(?,?,?,?)"] * num_rows) +
+            " ON CONFLICT(parent, slot_name, slot_num) DO UPDATE SET child=excluded.child")
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Quotes a table or column name so it can be placed directly into SQL.
+
+    :param name: Name to quote. May contain any characters, including quotes.
+    :return: Name as an SQL identifier.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
 class WindowManager(SingleApplication):
     """
     Central manager for every panels window.
@@ -36,12 +110,6 @@ class WindowManager(SingleApplication):
     their information to the original one and then close.
     """
 
-    # Types of panels currently able to be created.
-    PANEL_TYPES = {shelves.PShelfVert, shelves.PShelfHoriz, simple_inputs.PTask, simple_inputs.PNumber,
-                   types.PType, shelves.PFootnote, types.PCreator, types.PFinder, time_manage.PCalendar,
-                   shelves.PMatrix}
-    # TODO: Load panel types automatically from installed scripts
-
     def __init__(self, sid, db_path, *argv):
         super(WindowManager, self).__init__(sid, *argv)
 
@@ -52,6 +120,10 @@ class WindowManager(SingleApplication):
         self.panel_classes = None
         self.drag_target = None
         self.drag_panelid = None
+        self.pending_updates = None
+        self.flush_scheduled = False
+        self.statement_cache = None
+        self.type_cache = None
 
         # Call init_manager when this object becomes the main application and server
         self.picked.connect(self.init_manager)
@@ -64,13 +136,22 @@ class WindowManager(SingleApplication):
 
         This method is called once this object is chosen as the main application.
         """
+        # Panel modules are only needed once this is the server, so instances passing arguments never load them
+        from panels import PANEL_REGISTRY
+
         self.db_con = open_db(self.db_path)
         self.db_cur = self.db_con.cursor()
         # Stores all open windows underneath their panel id. This is necessary so windows aren't garbage collected and
         # to allow panel updates to propagate to other windows.
         self.windows: dict[str, set[PanelWidget]] = {}
         # Stores all panel types by name
-        self.panel_classes: dict[str, type] = {p.panel_type(): p for p in self.PANEL_TYPES}
+        self.panel_classes: dict[str, type] = PANEL_REGISTRY
+        # Updates queued by panel widgets that have yet to be written, stored under their panel id
+        self.pending_updates: dict[str, tuple[PanelWidget, dict[str, object], dict[tuple[str, int], str | None]]] = {}
+        # Stores SQL statements for each type's attribute table, formed the first time the type is used
+        self.statement_cache: dict[str, dict] = {}
+        # Stores the type of each panel already read or created. A panel's type never changes once it is created
+        self.type_cache: dict[str, str] = {}
 
     def invent_panel(self, panelid: str, panel_type: str):
         """
@@ -79,29 +160,43 @@ class WindowManager(SingleApplication):
         :param panelid: ID to create panel under
         :param panel_type: Type of new panel
         """
-        # Reject blank string as name
-        if panelid == "":
-            raise Exception("Cannot make panels with no name")
-
-        # Get class for panel type if given
-        panel_class = self.panel_classes[panel_type]
-        if not panel_class.allow_user_creation():
-            raise Exception("User cannot create new panels of this type")
-
-        # Initiate database for this type if it isn't already initialized
-        self.try_init_type_in_db(panel_type)
+        self.invent_panels([(panelid, panel_type)])
 
-        # Add to metadata table
-        self.db_cur.execute("INSERT INTO Panels VALUES (?, ?)", (panelid, panel_type))
-        if len(panel_class.attributes()) > 0:
-            # If the type has attributes, add this panel's attributes to the type's table
-            self.db_cur.execute("INSERT INTO {}(panelid) VALUES (?)".format(panel_type), (panelid,))
-        self.db_con.commit()
+    def invent_panels(self, new_panels: list[tuple[str, str]]):
+        """
+        Adds several panels to the database in a single transaction.
 
-        for pair in panel_class.default_attributes().items():
-            # Update this panel's row in its type's table to the default types
-            self.db_cur.execute("UPDATE {} SET {}=? WHERE panelid=?".format(panel_type, pair[0]), (pair[1], panelid))
-            self.db_con.commit()
+        :param new_panels: List of the ID and type of each panel to create
+        """
+        # Check every panel before writing any, so a rejected panel leaves nothing half-written
+        for panelid, panel_type in new_panels:
+            # Reject blank string as name
+            if panelid == "":
+                raise Exception("Cannot make panels with no name")
+
+            # Get class for panel type if given
+            if not self.panel_classes[panel_type].allow_user_creation():
+                raise Exception("User cannot create new panels of this type")
+
+        # Write every panel in one transaction. A failed insert, such as a taken id, rolls all of them back
+        with self.db_con:
+            for panelid, panel_type in new_panels:
+                panel_class = self.panel_classes[panel_type]
+
+                # Initiate database for this type if it isn't already initialized
+                self.try_init_type_in_db(panel_type)
+
+                # Add to metadata table
+                self.db_cur.execute(PANEL_INSERT_SQL, (panelid, panel_type))
+                if len(panel_class.attributes()) > 0:
+                    # If the type has attributes, add this panel's row to the type's table, already holding the
+                    # default values
+                    defaults = panel_class.default_attributes()
+                    statement = self.insert_statement(panel_type, tuple(defaults))
+                    self.db_cur.execute(statement, (panelid, *defaults.values()))
+
+        # Only remember the types once they are committed
+        self.type_cache.update(new_panels)
 
     def make_panel_widget(self, panelid: str, panel_type: str = None) -> PanelWidget:
         """
@@ -118,10 +213,8 @@ class WindowManager(SingleApplication):
             # If type given, must add panel to database
             self.invent_panel(panelid, panel_type)
 
-        # Find panel's metadata in the database
-        res = self.db_cur.execute("SELECT module FROM Panels WHERE id = ?", (panelid,))
-        entry = res.fetchone()
-        panel_class = self.panel_classes[entry[0]]
+        # Find panel's type
+        panel_class = self.panel_classes[self.type_of_panel(panelid)]
 
         # Form the new widget
         widget = panel_class(panelid, self)
@@ -183,31 +276,98 @@ class WindowManager(SingleApplication):
         """
         If needed, create a database table and type panel for the panel's type.
 
-        :param panel_widget: Widget whose type should have its initialization attempted.
+        Changes are not committed, so the caller's transaction holds the type along with the panels that use it.
+        :param panel_type: Type whose initialization should be attempted.
         """
 
-        res = self.db_cur.execute("SELECT * from Panels WHERE module='type' and id=?", (panel_type,))
+        res = self.db_cur.execute(TYPE_PANEL_SQL, (panel_type,))
         # Type already initialized in table, don't need to add it
         if res.fetchone() is not None:
             return
 
         # Add a panel of type 'type' to represent this type
-        self.db_cur.execute("INSERT INTO Panels VALUES (?, ?)", (panel_type, 'type'))
-        self.db_con.commit()
+        self.db_cur.execute(PANEL_INSERT_SQL, (panel_type, 'type'))
 
         # Only needs a table if the type has attributes
         attributes = self.panel_classes[panel_type].attributes()
         if len(attributes) > 0:
             table = panel_type
             # Only add table if it doesn't already exist. This line also validates the SQL
-            res = self.db_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+            res = self.db_cur.execute(TABLE_EXISTS_SQL, (table,))
             if res.fetchone() is None:
-                # Create the table
-                self.db_cur.execute("CREATE TABLE {} (panelid TEXT PRIMARY KEY)".format(table))
-                # Add all attributes as columns
-                for pair in attributes.items():
-                    self.db_cur.execute("ALTER TABLE {} ADD {} {}".format(table, pair[0], pair[1]))
-                self.db_con.commit()
+                # Create the table with all attributes as columns in one statement, rather than altering it once for
+                # each column
+                columns = "".join(", {} {}".format(quote_identifier(name), definition)
+                                  for name, definition in attributes.items())
+                statement = "CREATE TABLE {} (panelid TEXT PRIMARY KEY{})".format(quote_identifier(table), columns)
+                self.db_cur.execute(statement)
+
+    def type_statements(self, panel_type: str) -> dict:
+        """
+        Gets the SQL statements used to access a type's attribute table, forming them on first use.
+
+        Reusing the same statement strings lets SQLite reuse its compiled statements instead of parsing new ones. Table
+        and column names are quoted once, as the statements are formed.
+        :param panel_type: Type whose attribute table is accessed.
+        :return: Dictionary with a "select" statement, and "insert" and "update" statements under each tuple of
+                 attribute names they set. The select statement reads the type's attributes in the order they are
+                 defined.
+        """
+        statements = self.statement_cache.get(panel_type)
+        if statements is None:
+            columns = ", ".join(quote_identifier(c) for c in self.panel_classes[panel_type].attributes())
+            statements = {
+                "insert": {},
+                "select": "SELECT {} FROM {} WHERE panelid = ?".format(columns, quote_identifier(panel_type)),
+                "update": {}
+            }
+            self.statement_cache[panel_type] = statements
+        return statements
+
+    def attribute_statement(self, panel_type: str, kind: str, columns: tuple[str, ...], form) -> str:
+        """
+        Gets a cached SQL statement that sets some of a type's attributes, forming it on first use.
+
+        :param panel_type: Type whose attribute table is accessed.
+        :param kind: Key of the statements in the type's cache, either "insert" or "update".
+        :param columns: Names of the attributes to set, in the order their values are given.
+        :param form: Function forming the statement from the quoted table name and quoted attribute names.
+        :return: SQL statement returned by form.
+        """
+        statements = self.type_statements(panel_type)[kind]
+        statement = statements.get(columns)
+        if statement is None:
+            # Names are placed directly into the SQL, so only allow the type's own attributes
+            attributes = self.panel_classes[panel_type].attributes()
+            if any(column not in attributes for column in columns):
+                raise Exception("Panel type has no such attribute")
+            statement = form(quote_identifier(panel_type), [quote_identifier(c) for c in columns])
+            statements[columns] = statement
+        return statement
+
+    def insert_statement(self, panel_type: str, columns: tuple[str, ...]) -> str:
+        """
+        Gets the SQL statement that adds a panel's row to its type's table with some attributes already set,
+        forming it on first use.
+
+        :param panel_type: Type whose attribute table is added to.
+        :param columns: Names of the attributes to set, in the order their values are given.
+        :return: SQL statement taking the panel id followed by each attribute's value.
+        """
+        return self.attribute_statement(panel_type, "insert", columns, lambda table, names: (
+            "INSERT INTO {}(panelid{}) VALUES (?{})".format(table, "".join(", " + n for n in names),
+                                                            ", ?" * len(names))))
+
+    def update_statement(self, panel_type: str, columns: tuple[str, ...]) -> str:
+        """
+        Gets the SQL statement that sets several attributes of a panel at once, forming it on first use.
+
+        :param panel_type: Type whose attribute table is updated.
+        :param columns: Names of the attributes to set, in the order their values are given.
+        :return: SQL statement taking each attribute's value followed by the panel id.
+        """
+        return self.attribute_statement(panel_type, "update", columns, lambda table, names: (
+            "UPDATE {} SET {} WHERE panelid=?".format(table, ", ".join(n + "=?" for n in names))))
 
     def type_of_panel(self, panelid: str) -> str | None:
         """
@@ -216,9 +376,16 @@ class WindowManager(SingleApplication):
         :param panelid: ID of the panel to query
         :return: Type of the panel as stored in the database. None if absent from db
         """
-        res = self.db_cur.execute("SELECT module FROM Panels WHERE id=?", (panelid,))
-        fetched = res.fetchone()
-        return fetched['module'] if fetched is not None else None
+        panel_type = self.type_cache.get(panelid)
+        if panel_type is None:
+            res = self.db_cur.execute(PANEL_TYPE_SQL, (panelid,))
+            fetched = res.fetchone()
+            if fetched is None:
+                # Not cached, as the panel may be created later
+                return None
+            panel_type = fetched['module']
+            self.type_cache[panelid] = panel_type
+        return panel_type
 
     def get_attributes_dict(self, panel_widget: PanelWidget) -> dict[str, object]:
         """
@@ -228,13 +395,13 @@ class WindowManager(SingleApplication):
         :return: Dictionary matching name of each attribute to its value for this panel. Empty if no attributes.
         """
         # Only fill dictionary if the type has attributes
-        if len(panel_widget.attributes()) > 0:
+        attributes = panel_widget.attributes()
+        if len(attributes) > 0:
             # Select row from the type's attribute table
-            res = self.db_cur.execute("SELECT * FROM {} WHERE panelid = ?".format(panel_widget.panel_type()),
-                                      (panel_widget.name,))
+            res = self.db_cur.execute(self.type_statements(panel_widget.panel_type())["select"], (panel_widget.name,))
             row = res.fetchone()
-            # Construct a dictionary from the row's column values
-            return {k: row[k] for k in row.keys()}
+            # Columns are selected in the order of the type's attributes, so pair them up by position
+            return dict(zip(attributes, row))
         else:
             return None
 
@@ -243,17 +410,63 @@ class WindowManager(SingleApplication):
         Retrieve a dictionary of all of the subpanels filling the slots for a panel.
 
         :param panel_widget: Panel widget that needs subpanels.
-        :return: Dictionary of slot identifier to id of subpanel in that slot. Empty if none.
+        :return: Dictionary of slot identifier to id of subpanel in that slot. None if there are none.
         """
-        # Select slots from the slot table in the database
-        res = self.db_cur.execute("SELECT * FROM Slots WHERE parent = ?", (panel_widget.name,))
-        rows = res.fetchall()
-        if len(rows) > 0:
-            # Format rows into dictionary entries
-            ret_dict = {(r['slot_name'], r['slot_num']): r['child'] for r in rows}
-            return ret_dict
+        # Select slots from the slot table in the database, formatting rows into dictionary entries as they are read
+        res = self.db_cur.execute(SLOTS_OF_PANEL_SQL, (panel_widget.name,))
+        ret_dict = {(r['slot_name'], r['slot_num']): r['child'] for r in res}
+        # Panels with no slots, such as types, can't be filled with an empty dictionary
+        return ret_dict if len(ret_dict) > 0 else None
+
+    def queue_update(self, panel_widget: PanelWidget, attribute_dict: dict[str, object] | None,
+                     slots_dict: dict[tuple[str, int], str | None] | None):
+        """
+        Queues updates to a panel so that all updates made before control returns to the event loop are written
+        to the database in a single transaction.
+
+        Updates to the same panel are merged, so any update computed from a panel's current widgets must flush the
+        queue first.
+
+        :param panel_widget: The widget that initiated these updates.
+        :param attribute_dict: Dictionary of attribute names to their new values.
+        :param slots_dict: Dictionary of slot identifiers to the id of the subpanel now filling them, or None if the
+                           subpanel must be deleted.
+        """
+        panelid = panel_widget.name
+        if panelid in self.pending_updates:
+            # Merge with updates already queued for this panel. Later values overwrite earlier ones
+            queued = self.pending_updates[panelid]
+            if attribute_dict:
+                queued[1].update(attribute_dict)
+            if slots_dict:
+                queued[2].update(slots_dict)
         else:
-            return None
+            # Copy dictionaries so later merges don't modify the caller's values
+            self.pending_updates[panelid] = (panel_widget, dict(attribute_dict or {}), dict(slots_dict or {}))
+
+        # Flush once control returns to the event loop
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            QTimer.singleShot(0, self.flush_updates)
+
+    def flush_updates(self):
+        """
+        Writes all queued updates to the database in one transaction and passes them to the open windows.
+        """
+        self.flush_scheduled = False
+        # Drop panels whose queued updates are all empty, as there is nothing to write or pass on
+        pending = {panelid: update for panelid, update in self.pending_updates.items() if update[1] or update[2]}
+        self.pending_updates = {}
+        if len(pending) == 0:
+            return
+
+        # Write all updates in one transaction. Nothing is kept if any write fails
+        with self.db_con:
+            self.write_updates(pending.values())
+
+        # Pass updates to all windows once they are stored
+        for panel_widget, attribute_dict, slots_dict in pending.values():
+            self.propagate_updates(panel_widget.name, attribute_dict, slots_dict)
 
     def update_panel(self, panel_widget: PanelWidget, attribute_dict: dict[str, object],
                      slots_dict: dict[tuple[str, int], str | None]):
@@ -265,51 +478,122 @@ class WindowManager(SingleApplication):
         :param slots_dict: Dictionary of slot identifiers (name and number) to the id of the subpanel now filling them,
                            or None if the subpanel must be deleted.
         """
-        panelid = panel_widget.name
-        # Update attributes
-        if attribute_dict is not None:
-            table = panel_widget.panel_type()
-            for pair in attribute_dict.items():
-                # Update this panel's row in its type's table
-                self.db_cur.execute("UPDATE {} SET {}=? WHERE panelid=?".format(table, pair[0]), (pair[1], panelid))
-                self.db_con.commit()
-        # Update slots
-        if slots_dict is not None:
-            # Mark which slots must be deleted entirely
-            deletes = [(panelid, x[0][0], x[0][1]) for x in slots_dict.items() if x[1] is None]
-            # Mark which slots must have their value replaced
-            updates = [(panelid, x[0][0], x[0][1], x[1]) for x in slots_dict.items() if x[1] is not None]
-            # Run queries to delete and replace necessary slots
-            self.db_cur.executemany("DELETE FROM Slots WHERE (parent, slot_name, slot_num) = (?,?,?)", deletes)
-            self.db_cur.executemany("INSERT OR REPLACE INTO Slots VALUES(?,?,?,?)", updates)
-            self.db_con.commit()
-        # Pass updates to all windows containing this panel
-        for window_id in self.windows.items():
+        # Write queued updates first, so they can't be written over this newer one later
+        self.flush_updates()
+
+        # Nothing to write or pass on
+        if not attribute_dict and not slots_dict:
+            return
+
+        # Write all updates in one transaction. Nothing is kept if any write fails
+        with self.db_con:
+            self.write_updates([(panel_widget, attribute_dict, slots_dict)])
+        self.propagate_updates(panel_widget.name, attribute_dict, slots_dict)
+
+    def write_updates(self, updates):
+        """
+        Writes attribute and slot changes for several panels to the database without committing them.
+
+        :param updates: Iterable of tuples holding a widget of the changed panel, a dictionary of attribute names to
+                        their new values, and a dictionary of slot identifiers to the id of the subpanel now filling
+                        them, or None if the subpanel must be deleted. Either dictionary may be None or empty.
+        """
+        attribute_rows: dict[str, list[tuple]] = {}  # Parameters for each attribute update statement
+        slot_deletes = []  # Slots that must be deleted entirely
+        slot_replaces = []  # Slots that must have their value replaced
+        for panel_widget, attribute_dict, slots_dict in updates:
+            panelid = panel_widget.name
+            if attribute_dict:
+                # Set all of the panel's changed attributes in one statement. Panels changing the same attributes
+                # share the statement, so each is run with a single executemany
+                statement = self.update_statement(panel_widget.panel_type(), tuple(attribute_dict))
+                attribute_rows.setdefault(statement, []).append((*attribute_dict.values(), panelid))
+            if slots_dict:
+                for slot, child in slots_dict.items():
+                    if child is None:
+                        slot_deletes.append((panelid, slot[0], slot[1]))
+                    else:
+                        slot_replaces.append((panelid, slot[0], slot[1], child))
+
+        # Update each panel's row in its type's table
+        for statement, rows in attribute_rows.items():
+            self.db_cur.executemany(statement, rows)
+        # Run queries to delete and replace necessary slots
+        if len(slot_deletes) > 0:
+            self.db_cur.executemany(SLOT_DELETE_SQL, slot_deletes)
+        # Write replacements with as few statements as possible
+        for start in range(0, len(slot_replaces), SLOT_ROWS_PER_STATEMENT):
+            chunk = slot_replaces[start:start + SLOT_ROWS_PER_STATEMENT]
+            self.db_cur.execute(slot_upsert_statement(len(chunk)), [value for row in chunk for value in row])
+
+    def propagate_updates(self, panelid: str, attribute_dict: dict[str, object],
+                          slots_dict: dict[tuple[str, int], str | None]):
+        """
+        Passes changes to a panel to every open window that contains it.
+
+        :param panelid: ID of the panel that was changed.
+        :param attribute_dict: Dictionary of attribute names to their new values.
+        :param slots_dict: Dictionary of slot identifiers to the id of the subpanel now filling them, or None if the
+                           subpanel must be deleted.
+        """
+        # Replace empty dictionaries once so each step down the path only needs to check for None
+        if not attribute_dict:
+            attribute_dict = None
+        if not slots_dict:
+            slots_dict = None
+        if attribute_dict is None and slots_dict is None:
+            return
+
+        # Find every slot leading to this panel with one query, rather than searching down from each window
+        slots_by_parent = self.slots_above(panelid)
+
+        # Pass updates to all windows containing this panel. Iterate over a copy, as windows may be closed by updates
+        for root_id, windows in list(self.windows.items()):
+            # Skip windows whose panel doesn't hold this panel
+            if root_id != panelid and root_id not in slots_by_parent:
+                continue
             # Get list of paths within a specific window
-            paths_to_panel = self.find_subpanel(window_id[0], panelid)
-            for window in window_id[1]:
+            paths_to_panel = self.paths_between(root_id, panelid, slots_by_parent)
+            for window in list(windows):
                 for path in paths_to_panel:
                     # Pass changes to the window along with the path it must follow to find the panel
-                    window.pass_down_changes(path[1:], attribute_dict, slots_dict)
+                    window.pass_down_changes(path, attribute_dict, slots_dict)
+
+    def slots_above(self, target: str) -> dict[str, list[tuple[str, int, str]]]:
+        """
+        Finds every slot that lies on some path down the slot hierarchy to a panel.
 
-    def find_subpanel(self, starting_point: str, target: str) -> list[list[tuple[str, int]]]:
+        :param target: Panel that the slots lead to
+        :return: Dictionary of each parent panel to the name, number, and child of its slots that lead to the target
+        """
+        # Rows are returned as separate values, so no path strings need to be built or parsed
+        res = self.db_cur.execute(SLOTS_ABOVE_SQL, (target,))
+        slots_by_parent = {}
+        for parent, slot_name, slot_num, child in res:
+            slots_by_parent.setdefault(parent, []).append((slot_name, slot_num, child))
+        return slots_by_parent
+
+    def paths_between(self, starting_point: str, target: str,
+                      slots_by_parent: dict[str, list[tuple[str, int, str]]]) -> list[list[tuple[str, int]]]:
         """
-        Finds all paths from one panel down the slot hierarchy to another panel.
+        Lists all paths from one panel down to another, following only the given slots.
 
         :param starting_point: Panel to start navigating from
         :param target: Panel to search for
+        :param slots_by_parent: Slots leading to the target, as returned by slots_above
         :return: List of potential sequences of steps to take to find the target
         """
-        # Run recursive query on the slot table to find all paths
-        res = self.db_cur.execute("WITH RECURSIVE Paths AS ( \
-                                    SELECT ? as name, ':0' as path \
-                                    UNION ALL \
-                                    SELECT Slots.child, Paths.path || '/' || Slots.slot_name || ':' || Slots.slot_num \
-                                    FROM Slots JOIN Paths WHERE Slots.parent = Paths.name) \
-                                    SELECT path FROM Paths WHERE name = ?", (starting_point, target))
-        # Format query result as a list of lists of tuples
-        return [[(step[:step.index(':')], int(step[step.index(':')+1:])) for step in path['path'].split("/")] for path
-                in res.fetchall()]
+        paths = []
+        # Depth-first walk, holding each panel reached and the steps taken to reach it
+        to_visit = [(starting_point, [])]
+        while len(to_visit) > 0:
+            name, path = to_visit.pop()
+            if name == target:
+                paths.append(path)
+                continue
+            for slot_name, slot_num, child in slots_by_parent.get(name, ()):
+                to_visit.append((child, path + [(slot_name, slot_num)]))
+        return paths
 
     def query_panels(self, match_type: str) -> list[str]:
         """
@@ -318,7 +602,7 @@ class WindowManager(SingleApplication):
         :param match_type: The type of panel to query the list for
         :return: List of IDs for panels that match the query
         """
-        res = self.db_cur.execute("SELECT id FROM Panels WHERE module=?", (match_type,))
+        res = self.db_cur.execute(PANELS_OF_TYPE_SQL, (match_type,))
         rows = res.fetchall()
         return [x['id'] for x in rows]
 
@@ -332,15 +616,14 @@ class WindowManager(SingleApplication):
         drag = QDrag(self)
         # Track current drag. Needed for window creation
 
-        # Create an image of the panel to follow the cursor
-        pixmap = QPixmap(panel.size())
-        panel.render(pixmap)
-        drag.setPixmap(pixmap)
+        # Use an image of the panel to follow the cursor
+        drag.setPixmap(panel.drag_image())
 
-        # Pass the panel id as MIME data
+        # Pass the panel id as MIME data, along with its type so drop targets don't need to look it up
         mime = QMimeData()
         drag.setMimeData(mime)
         mime.setText(panel.name)
+        mime.setData(PanelWidget.TYPE_MIME_FORMAT, panel.panel_type().encode())
 
         # Set receiver for when the drag ends
         drag.targetChanged.connect(self.set_drag_target)